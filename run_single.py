@@ -12,7 +12,7 @@ import time
 
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-from instance import load_ortec_vrptw
+from instance import load_ortec_vrptw_cached
 from solver import solve_instance
 
 
@@ -37,7 +37,7 @@ def main():
     
     # Load instance
     print("Loading instance...")
-    inst = load_ortec_vrptw(inst_path)
+    inst = load_ortec_vrptw_cached(inst_path)
     print(f"  Nodes: {inst.n_nodes}")
     print(f"  Vehicles: {inst.n_vehicles}")
     print(f"  Capacity: {inst.capacity}\n")
@@ -4,7 +4,7 @@ VRPTW Solver using Regret Heuristic + Local Search
 """
 __version__ = "1.0.0"
 
-from .instance import VRPTWInstance, load_ortec_vrptw
+from .instance import VRPTWInstance, load_ortec_vrptw, load_ortec_vrptw_cached
 from .solution import Solution, Route
 from .solver import solve_instance
 from .validation import validate_solution
@@ -12,6 +12,7 @@ from .validation import validate_solution
 __all__ = [
     'VRPTWInstance',
     'load_ortec_vrptw',
+    'load_ortec_vrptw_cached',
     'Solution',
     'Route',
     'solve_instance',
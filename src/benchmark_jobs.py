@@ -0,0 +1,145 @@
+# src/benchmark_jobs.py
+"""
+Benchmark jobs shared by run_benchmark.py and benchmark_runner.
+
+A job is one (instance path, time budget) pair. Jobs are independent, so
+run_jobs fans them out over worker processes and collects their metrics.
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from instance import load_ortec_vrptw_cached
+from solver import solve_instance
+from validation import validate_solution
+
+
+def run_job(inst_path: Path, budget: int, validate: bool, verbose: bool) -> Dict:
+    """Solve one instance under one time budget and collect its metrics."""
+    inst = load_ortec_vrptw_cached(inst_path)
+
+    t0 = time.perf_counter()
+    sol, init_cost, final_cost, is_valid = solve_instance(
+        inst,
+        budget_s=budget,
+        validate=validate,
+        verbose=verbose,
+    )
+    wall_time = time.perf_counter() - t0
+
+    # Get detailed validation info
+    validation_result = validate_solution(inst, sol, verbose=False)
+
+    # Calculate metrics
+    improvement_pct = ((init_cost - final_cost) / init_cost * 100) if init_cost > 0 else 0
+
+    n_routes = sol.num_routes()
+    n_customers = sol.num_customers()
+
+    # Calculate average capacity utilization
+    total_capacity_used = sum(rv.total_demand for rv in validation_result.route_validations)
+    total_capacity_available = n_routes * inst.capacity
+    capacity_utilization = (total_capacity_used / total_capacity_available * 100) if total_capacity_available > 0 else 0
+
+    return {
+        'instance': inst_path.stem,
+        'n_nodes': inst.n_nodes,
+        'n_vehicles': inst.n_vehicles,
+        'capacity': inst.capacity,
+        'budget': budget,
+        'init_cost': init_cost,
+        'final_cost': final_cost,
+        'improvement_pct': improvement_pct,
+        'n_routes': n_routes,
+        'wall_time': wall_time,
+        'is_valid': is_valid,
+        'total_violations': validation_result.total_violations,
+        'unrouted_customers': len(validation_result.unrouted_customers),
+        'duplicate_customers': len(validation_result.duplicate_customers),
+        'capacity_utilization': capacity_utilization,
+        'customers_served': n_customers,
+    }
+
+
+def print_result(result: Dict) -> None:
+    """Print the summary block of one finished run."""
+    print(f"\n{'='*80}")
+    print(f"Instance: {result['instance']} | Budget: {result['budget']}s")
+    print(f"{'='*80}")
+    print(f"  Nodes: {result['n_nodes']}, Vehicles: {result['n_vehicles']}, Capacity: {result['capacity']}")
+    print(f"  Initial cost: {result['init_cost']}")
+    print(f"  Final cost: {result['final_cost']}")
+    print(f"  Improvement: {result['improvement_pct']:.2f}%")
+    print(f"  Routes: {result['n_routes']}")
+    print(f"  Customers served: {result['customers_served']}/{result['n_nodes'] - 1}")
+    print(f"  Capacity utilization: {result['capacity_utilization']:.1f}%")
+    print(f"  Wall time: {result['wall_time']:.2f}s")
+    print(f"  Valid: {'✓' if result['is_valid'] else '✗'}")
+    if result['total_violations'] > 0:
+        print(f"  ⚠️ Violations: {result['total_violations']}")
+
+
+def _run_job_captured(inst_path: Path, budget: int, validate: bool, verbose: bool) -> Tuple[str, Dict]:
+    """Run a job in a worker process, returning its printed output with the result."""
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        result = run_job(inst_path, budget, validate, verbose)
+    return buf.getvalue(), result
+
+
+def run_jobs(
+    instance_paths: List[Path],
+    time_budgets: List[int],
+    validate: bool = True,
+    verbose: bool = False,
+    workers: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Run every (instance, budget) job and print each summary as it finishes.
+
+    With more than one worker the jobs run in separate processes. Anything
+    a job prints (solver progress with verbose, validation warnings) is
+    captured in the worker and printed by the parent together with the
+    job's summary, so the output of concurrent jobs never interleaves.
+
+    Args:
+        instance_paths: List of instance file paths
+        time_budgets: List of time budgets in seconds
+        validate: Perform validation
+        verbose: Print detailed progress
+        workers: Parallel worker processes (default: CPU count, 1 = sequential)
+
+    Returns:
+        Result dicts from run_job, in instance order then budget order
+    """
+    jobs = [(inst_path, budget) for inst_path in instance_paths for budget in time_budgets]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+
+    print(f"\nRunning {len(jobs)} jobs on {workers} worker(s)...")
+
+    results_by_job = {}
+    if workers == 1:
+        for job_idx, (inst_path, budget) in enumerate(jobs):
+            result = run_job(inst_path, budget, validate, verbose)
+            results_by_job[job_idx] = result
+            print_result(result)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_run_job_captured, inst_path, budget, validate, verbose): job_idx
+                for job_idx, (inst_path, budget) in enumerate(jobs)
+            }
+            for future in as_completed(futures):
+                output, result = future.result()
+                results_by_job[futures[future]] = result
+                sys.stdout.write(output)
+                print_result(result)
+
+    return [results_by_job[job_idx] for job_idx in range(len(jobs))]
@@ -2,14 +2,24 @@
 """
 Benchmark runner for multiple instances with Excel output.
 """
-import time
+import io
+from collections import defaultdict
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill
 
-from .instance import load_ortec_vrptw
-from .solver import solve_instance
+from .benchmark_jobs import run_jobs
+
+
+# Shared style instances, built once instead of per cell
+_HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+_HEADER_FONT = Font(bold=True, color="FFFFFF")
+_HEADER_ALIGNMENT = Alignment(horizontal='center')
+_RESULTS_COL_WIDTH = 18
+_TITLE_FONT = Font(bold=True, size=14)
+_BOLD = Font(bold=True)
 
 
 def run_benchmark(
@@ -18,6 +28,7 @@ def run_benchmark(
     output_excel: Path,
     validate: bool = True,
     verbose: bool = False,
+    workers: Optional[int] = None,
 ) -> None:
     """
     Run benchmark on multiple instances with multiple time budgets.
@@ -28,57 +39,9 @@ def run_benchmark(
         output_excel: Path for output Excel file
         validate: Perform validation
         verbose: Print detailed progress
+        workers: Parallel worker processes (default: CPU count, 1 = sequential)
     """
-    results = []
-    
-    for inst_path in instance_paths:
-        inst_name = inst_path.stem
-        print(f"\n{'='*80}")
-        print(f"Instance: {inst_name}")
-        print(f"{'='*80}")
-        
-        # Load instance
-        print(f"Loading instance...")
-        inst = load_ortec_vrptw(inst_path)
-        print(f"  Nodes: {inst.n_nodes}, Vehicles: {inst.n_vehicles}, Capacity: {inst.capacity}")
-        
-        for budget in time_budgets:
-            print(f"\n--- Budget: {budget}s ---")
-            
-            t0 = time.perf_counter()
-            sol, init_cost, final_cost, is_valid = solve_instance(
-                inst,
-                budget_s=budget,
-                validate=validate,
-                verbose=verbose,
-            )
-            wall_time = time.perf_counter() - t0
-            
-            # Calculate metrics
-            improvement_pct = ((init_cost - final_cost) / init_cost * 100) if init_cost > 0 else 0
-            
-            result = {
-                'instance': inst_name,
-                'n_nodes': inst.n_nodes,
-                'n_vehicles': inst.n_vehicles,
-                'capacity': inst.capacity,
-                'budget': budget,
-                'init_cost': init_cost,
-                'final_cost': final_cost,
-                'improvement_pct': improvement_pct,
-                'n_routes': sol.num_routes(),
-                'wall_time': wall_time,
-                'is_valid': is_valid,
-            }
-            
-            results.append(result)
-            
-            print(f"  Initial cost: {init_cost}")
-            print(f"  Final cost: {final_cost}")
-            print(f"  Improvement: {improvement_pct:.2f}%")
-            print(f"  Routes: {sol.num_routes()}")
-            print(f"  Wall time: {wall_time:.2f}s")
-            print(f"  Valid: {'✓' if is_valid else '✗'}")
+    results = run_jobs(instance_paths, time_budgets, validate, verbose, workers)
     
     # Write to Excel
     print(f"\n{'='*80}")
@@ -89,74 +52,71 @@ def run_benchmark(
 
 def _write_excel(results: List[Dict], output_path: Path, time_budgets: List[int]) -> None:
     """Write results to Excel with formatting."""
-    wb = openpyxl.Workbook()
+    # Write-only mode streams rows to disk instead of keeping a cell grid
+    wb = openpyxl.Workbook(write_only=True)
+    
+    # Bucket results by budget once; every sheet below reads its bucket
+    by_budget = defaultdict(list)
+    for r in results:
+        by_budget[r['budget']].append(r)
+    
+    # Summary sheet
+    ws_summary = wb.create_sheet("Summary")
+    title_cell = WriteOnlyCell(ws_summary, value="Benchmark Summary")
+    title_cell.font = _TITLE_FONT
+    ws_summary.append([title_cell])
+    ws_summary.append([])
+    ws_summary.append(["Time Budgets:", ", ".join(f"{b}s" for b in time_budgets)])
+    ws_summary.append(["Instances:", len(set(r['instance'] for r in results))])
+    ws_summary.append(["Total Runs:", len(results)])
+    ws_summary.append(["All Valid:", '✓' if all(r['is_valid'] for r in results) else '✗'])
+    ws_summary.append([])
     
-    # Remove default sheet
-    if 'Sheet' in wb.sheetnames:
-        wb.remove(wb['Sheet'])
+    # Budget comparison
+    section_cell = WriteOnlyCell(ws_summary, value="Average Improvement by Budget:")
+    section_cell.font = _BOLD
+    ws_summary.append([section_cell])
+    
+    for budget in time_budgets:
+        budget_results = by_budget[budget]
+        avg_improvement = sum(r['improvement_pct'] for r in budget_results) / len(budget_results)
+        ws_summary.append([f"{budget}s:", f"{avg_improvement:.2f}%"])
     
     # Create sheets for each time budget
+    headers = ['Instance', 'Nodes', 'Vehicles', 'Capacity', 'Initial Cost', 
+               'Final Cost', 'Improvement %', 'Routes', 'Wall Time (s)', 'Valid']
+    
+    # Each budget sheet is streamed to its own temp file before the next one
     for budget in time_budgets:
-        budget_results = [r for r in results if r['budget'] == budget]
-        
         ws = wb.create_sheet(f"{budget}s")
+        # One sheet-level default instead of a width per column
+        ws.sheet_format.defaultColWidth = _RESULTS_COL_WIDTH
         
-        # Headers
-        headers = ['Instance', 'Nodes', 'Vehicles', 'Capacity', 'Initial Cost', 
-                   'Final Cost', 'Improvement %', 'Routes', 'Wall Time (s)', 'Valid']
-        
-        # Style headers
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")
-        
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal='center')
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.fill = _HEADER_FILL
+            cell.font = _HEADER_FONT
+            cell.alignment = _HEADER_ALIGNMENT
+            header_cells.append(cell)
+        ws.append(header_cells)
         
         # Data rows
-        for row_idx, result in enumerate(budget_results, 2):
-            ws.cell(row=row_idx, column=1, value=result['instance'])
-            ws.cell(row=row_idx, column=2, value=result['n_nodes'])
-            ws.cell(row=row_idx, column=3, value=result['n_vehicles'])
-            ws.cell(row=row_idx, column=4, value=result['capacity'])
-            ws.cell(row=row_idx, column=5, value=result['init_cost'])
-            ws.cell(row=row_idx, column=6, value=result['final_cost'])
-            ws.cell(row=row_idx, column=7, value=f"{result['improvement_pct']:.2f}")
-            ws.cell(row=row_idx, column=8, value=result['n_routes'])
-            ws.cell(row=row_idx, column=9, value=f"{result['wall_time']:.2f}")
-            ws.cell(row=row_idx, column=10, value='✓' if result['is_valid'] else '✗')
-        
-        # Auto-size columns
-        for col in range(1, len(headers) + 1):
-            ws.column_dimensions[openpyxl.utils.get_column_letter(col)].width = 18
-    
-    # Summary sheet
-    ws_summary = wb.create_sheet("Summary", 0)
-    ws_summary['A1'] = "Benchmark Summary"
-    ws_summary['A1'].font = Font(bold=True, size=14)
-    
-    ws_summary['A3'] = "Time Budgets:"
-    ws_summary['B3'] = ", ".join(f"{b}s" for b in time_budgets)
-    
-    ws_summary['A4'] = "Instances:"
-    ws_summary['B4'] = len(set(r['instance'] for r in results))
-    
-    ws_summary['A5'] = "Total Runs:"
-    ws_summary['B5'] = len(results)
-    
-    ws_summary['A6'] = "All Valid:"
-    ws_summary['B6'] = '✓' if all(r['is_valid'] for r in results) else '✗'
-    
-    # Budget comparison
-    ws_summary['A8'] = "Average Improvement by Budget:"
-    ws_summary['A8'].font = Font(bold=True)
-    
-    for idx, budget in enumerate(time_budgets, 9):
-        budget_results = [r for r in results if r['budget'] == budget]
-        avg_improvement = sum(r['improvement_pct'] for r in budget_results) / len(budget_results)
-        ws_summary[f'A{idx}'] = f"{budget}s:"
-        ws_summary[f'B{idx}'] = f"{avg_improvement:.2f}%"
+        for result in by_budget[budget]:
+            ws.append([
+                result['instance'],
+                result['n_nodes'],
+                result['n_vehicles'],
+                result['capacity'],
+                result['init_cost'],
+                result['final_cost'],
+                f"{result['improvement_pct']:.2f}",
+                result['n_routes'],
+                f"{result['wall_time']:.2f}",
+                '✓' if result['is_valid'] else '✗',
+            ])
     
-    wb.save(output_path)
+    # Serialize in memory and write the file with a single call
+    buf = io.BytesIO()
+    wb.save(buf)
+    Path(output_path).write_bytes(buf.getvalue())
@@ -2,28 +2,96 @@
 """
 VRPTW instance loader for ORTEC instances.
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Tuple, Optional, Dict
-import math
+import os
+import pickle
 import re
 
+import numpy as np
 
-@dataclass
+
+# Bump whenever VRPTWInstance changes layout so stale caches are rebuilt
+_CACHE_VERSION = 4
+
+# Parser patterns, compiled once at import
+_HEADER_PATTERNS = {
+    key: re.compile(rf'\b{key}\s*:\s*(\d+)', re.IGNORECASE)
+    for key in ("VEHICLES", "CAPACITY", "DIMENSION")
+}
+_SECTION_HEADER_RE = re.compile(r'^\s*([A-Z_]+_SECTION)\b', re.IGNORECASE)
+_EOF_RE = re.compile(r'^\s*EOF\b', re.IGNORECASE)
+
+
+@dataclass(frozen=True, eq=False)
 class VRPTWInstance:
     """
     VRPTW instance representation.
     
+    Immutable once loaded. eq is disabled because the array fields have no
+    scalar equality, so instances compare and hash by identity.
+    
     Attributes:
         n_vehicles: Number of available vehicles
         capacity: Vehicle capacity
         depot: Depot node index (typically 0)
-        travel_time: Distance/time matrix [n x n]
+        travel_time: Distance/time matrix [n x n], C-contiguous int32
+        demand: Demand for each node (int32)
+        ready_time: Earliest service time for each node (int32)
+        due_time: Latest service time for each node (int32)
+        service_time: Service duration for each node (int32)
+        c_from_depot: Travel time from the depot to every node (int32)
+        c_to_depot: Travel time from every node back to the depot (int32)
+    
+    c_from_depot and c_to_depot are derived from travel_time once, when the
+    instance is built, and stored as contiguous arrays.
+    """
+    n_vehicles: int
+    capacity: int
+    depot: int
+    travel_time: np.ndarray
+    demand: np.ndarray
+    ready_time: np.ndarray
+    due_time: np.ndarray
+    service_time: np.ndarray
+    c_from_depot: np.ndarray = field(init=False, repr=False)
+    c_to_depot: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Frozen dataclass: derived fields are set through object.__setattr__
+        object.__setattr__(self, "c_from_depot", self.travel_time[self.depot].copy())
+        object.__setattr__(
+            self, "c_to_depot", np.ascontiguousarray(self.travel_time[:, self.depot])
+        )
+
+    @property
+    def n_nodes(self) -> int:
+        """Total number of nodes (including depot)."""
+        return len(self.demand)
+
+
+@dataclass(frozen=True, eq=False)
+class SearchInstance:
+    """
+    List-backed copy of a VRPTWInstance for construction and local search.
+    
+    Those index single elements in interpreted loops, where list indexing
+    is several times cheaper than NumPy scalar access. Vectorized code uses
+    the NumPy-backed source instead of converting the lists back.
+    
+    Attributes:
+        source: The VRPTWInstance this copy was made from
+        n_vehicles: Number of available vehicles
+        capacity: Vehicle capacity
+        depot: Depot node index
+        travel_time: Distance/time matrix as a list of rows
         demand: Demand for each node
         ready_time: Earliest service time for each node
         due_time: Latest service time for each node
         service_time: Service duration for each node
     """
+    source: VRPTWInstance
     n_vehicles: int
     capacity: int
     depot: int
@@ -39,62 +107,148 @@ class VRPTWInstance:
         return len(self.demand)
 
 
-def _euclid_rounded(x1: float, y1: float, x2: float, y2: float) -> int:
-    """Euclidean distance rounded to nearest integer."""
-    return int(round(math.hypot(x1 - x2, y1 - y2)))
+def to_search_instance(inst: VRPTWInstance) -> SearchInstance:
+    """Build the list-backed SearchInstance for inst."""
+    return SearchInstance(
+        source=inst,
+        n_vehicles=inst.n_vehicles,
+        capacity=inst.capacity,
+        depot=inst.depot,
+        travel_time=inst.travel_time.tolist(),
+        demand=inst.demand.tolist(),
+        ready_time=inst.ready_time.tolist(),
+        due_time=inst.due_time.tolist(),
+        service_time=inst.service_time.tolist(),
+    )
+
+
+def _euclid_rounded_matrix(xs: List[float], ys: List[float]) -> np.ndarray:
+    """Pairwise Euclidean distances rounded to nearest integer."""
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    dx = xs[:, None] - xs[None, :]
+    dy = ys[:, None] - ys[None, :]
+    matrix = np.rint(np.hypot(dx, dy)).astype(np.int32)
+    np.fill_diagonal(matrix, 0)
+    return matrix
 
 
 def _parse_header_value(lines: List[str], key: str) -> Optional[int]:
     """Parse header value like 'VEHICLES : 42'."""
-    pattern = rf'\b{re.escape(key)}\s*:\s*(\d+)'
+    pattern = _HEADER_PATTERNS.get(key)
+    if pattern is None:
+        pattern = re.compile(rf'\b{re.escape(key)}\s*:\s*(\d+)', re.IGNORECASE)
     for line in lines:
-        match = re.search(pattern, line, re.IGNORECASE)
+        match = pattern.search(line)
         if match:
             return int(match.group(1))
     return None
 
 
-def _find_section(lines: List[str], section_name: str) -> Optional[int]:
-    """Find line index where section starts."""
+def _index_sections(lines: List[str]) -> Dict[str, Tuple[int, int]]:
+    """
+    Locate all sections in one pass.
+    
+    Returns:
+        Mapping of section name (e.g. 'DEMAND_SECTION') to the (start, end)
+        slice of its body lines, ending at the next section header or EOF
+    """
+    sections = {}
+    current = None
+    start = 0
     for idx, line in enumerate(lines):
-        if section_name.upper() in line.upper():
-            return idx + 1
-    return None
+        match = _SECTION_HEADER_RE.match(line)
+        if match is None and not _EOF_RE.match(line):
+            continue
+        if current is not None:
+            sections.setdefault(current, (start, idx))
+            current = None
+        if match is not None:
+            current = match.group(1).upper()
+            start = idx + 1
+    if current is not None:
+        sections.setdefault(current, (start, len(lines)))
+    return sections
 
 
-def _parse_id_value_section(lines: List[str], start_idx: int) -> Dict[int, int]:
-    """Parse section with format: id value"""
-    data = {}
-    for line in lines[start_idx:]:
-        if "SECTION" in line.upper() or "EOF" in line.upper():
-            break
+def _parse_int_section(lines: List[str], n_cols: int) -> np.ndarray:
+    """
+    Parse a section body with rows 'id value1 [value2 ...]'.
+    
+    The whole slice is parsed in C; if any row is short or non-integer the
+    rows are parsed one by one instead and the malformed ones skipped.
+    
+    Returns:
+        Array of shape [k x n_cols], column 0 holding the node ids
+    """
+    if not lines:
+        return np.empty((0, n_cols), dtype=np.int64)
+    try:
+        return np.loadtxt(lines, dtype=np.int64, usecols=range(n_cols), ndmin=2)
+    except ValueError:
+        pass
+    
+    rows = []
+    for line in lines:
         tokens = line.replace("\t", " ").split()
-        if len(tokens) >= 2:
+        if len(tokens) >= n_cols:
             try:
-                node_id = int(tokens[0])
-                value = int(tokens[1])
-                data[node_id] = value
+                rows.append([int(tok) for tok in tokens[:n_cols]])
             except ValueError:
                 pass
-    return data
+    return np.array(rows, dtype=np.int64).reshape(-1, n_cols)
 
 
-def _parse_id_two_values_section(lines: List[str], start_idx: int) -> Dict[int, Tuple[int, int]]:
-    """Parse section with format: id value1 value2"""
-    data = {}
-    for line in lines[start_idx:]:
-        if "SECTION" in line.upper() or "EOF" in line.upper():
-            break
+def _parse_coord_section(lines: List[str]) -> np.ndarray:
+    """
+    Parse NODE_COORD_SECTION body with rows 'id x y'.
+    
+    Returns:
+        Float array of shape [k x 3]; malformed rows are skipped as in
+        _parse_int_section
+    """
+    if not lines:
+        return np.empty((0, 3), dtype=np.float64)
+    try:
+        return np.loadtxt(lines, dtype=np.float64, usecols=(0, 1, 2), ndmin=2)
+    except ValueError:
+        pass
+    
+    rows = []
+    for line in lines:
         tokens = line.replace("\t", " ").split()
         if len(tokens) >= 3:
             try:
-                node_id = int(tokens[0])
-                val1 = int(tokens[1])
-                val2 = int(tokens[2])
-                data[node_id] = (val1, val2)
+                rows.append((int(tokens[0]), float(tokens[1]), float(tokens[2])))
             except ValueError:
                 pass
-    return data
+    return np.array(rows, dtype=np.float64).reshape(-1, 3)
+
+
+def _scatter_by_id(
+    all_ids: np.ndarray,
+    contiguous: bool,
+    ids: np.ndarray,
+    values: np.ndarray,
+    default,
+    dtype,
+) -> np.ndarray:
+    """
+    Place values at the index of their node id; nodes without a value get default.
+    
+    Contiguous ids are indexed directly by offset, otherwise positions are
+    looked up in the sorted id array. Ids outside all_ids are ignored.
+    """
+    out = np.full(all_ids.size, default, dtype=dtype)
+    if contiguous:
+        pos = ids - all_ids[0]
+        keep = (pos >= 0) & (pos < all_ids.size)
+    else:
+        pos = np.searchsorted(all_ids, ids)
+        keep = pos < all_ids.size
+        keep[keep] = all_ids[pos[keep]] == ids[keep]
+    out[pos[keep]] = values[keep]
+    return out
 
 
 def load_ortec_vrptw(path: Path) -> VRPTWInstance:
@@ -111,102 +265,121 @@ def load_ortec_vrptw(path: Path) -> VRPTWInstance:
     if not path.exists():
         raise FileNotFoundError(f"Instance not found: {path}")
 
-    raw_lines = [ln.strip() for ln in path.read_text(encoding="utf-8", errors="ignore").splitlines()]
-    lines = [ln for ln in raw_lines if ln and not ln.startswith("#")]
+    data = path.read_bytes().decode("utf-8", "ignore")
+    lines = [ln for ln in map(str.strip, data.splitlines()) if ln and ln[0] != "#"]
+
+    sections = _index_sections(lines)
+    header_end = min((start - 1 for start, _ in sections.values()), default=len(lines))
+    header = lines[:header_end]
 
     # Parse header
-    n_vehicles = _parse_header_value(lines, "VEHICLES")
-    capacity = _parse_header_value(lines, "CAPACITY")
-    dimension = _parse_header_value(lines, "DIMENSION")
+    n_vehicles = _parse_header_value(header, "VEHICLES")
+    capacity = _parse_header_value(header, "CAPACITY")
+    dimension = _parse_header_value(header, "DIMENSION")
     
     if n_vehicles is None or capacity is None:
         raise RuntimeError(f"Failed to parse VEHICLES and/or CAPACITY from {path.name}")
     
     # Parse sections
     travel_time = None
-    matrix_idx = _find_section(lines, "EDGE_WEIGHT_SECTION")
-    if matrix_idx and dimension:
-        all_numbers = []
-        for line in lines[matrix_idx:]:
-            if "SECTION" in line.upper():
-                break
-            tokens = line.replace("\t", " ").split()
-            for tok in tokens:
-                try:
-                    all_numbers.append(int(tok))
-                except ValueError:
-                    pass
+    if "EDGE_WEIGHT_SECTION" in sections and dimension:
+        start, end = sections["EDGE_WEIGHT_SECTION"]
+        chunk = " ".join(lines[start:end])
+        all_numbers = np.fromstring(chunk, dtype=np.int32, sep=" ")
         
-        if len(all_numbers) >= dimension * dimension:
-            travel_time = []
-            for i in range(dimension):
-                row = all_numbers[i * dimension:(i + 1) * dimension]
-                travel_time.append(row)
+        if all_numbers.size >= dimension * dimension:
+            travel_time = all_numbers[:dimension * dimension].reshape(dimension, dimension)
     
     # Node coordinates
-    coords = {}
-    coord_idx = _find_section(lines, "NODE_COORD_SECTION")
-    if coord_idx:
-        for line in lines[coord_idx:]:
-            if "SECTION" in line.upper():
-                break
-            tokens = line.replace("\t", " ").split()
-            if len(tokens) >= 3:
-                try:
-                    node_id = int(tokens[0])
-                    x = float(tokens[1])
-                    y = float(tokens[2])
-                    coords[node_id] = (x, y)
-                except ValueError:
-                    pass
+    start, end = sections.get("NODE_COORD_SECTION", (0, 0))
+    coord_arr = _parse_coord_section(lines[start:end])
+    coord_ids = coord_arr[:, 0].astype(np.int64)
     
     # Demands
-    demand_idx = _find_section(lines, "DEMAND_SECTION")
-    demands = _parse_id_value_section(lines, demand_idx) if demand_idx else {}
+    start, end = sections.get("DEMAND_SECTION", (0, 0))
+    demands = _parse_int_section(lines[start:end], 2)
     
     # Service times
-    service_idx = _find_section(lines, "SERVICE_TIME_SECTION")
-    services = _parse_id_value_section(lines, service_idx) if service_idx else {}
+    start, end = sections.get("SERVICE_TIME_SECTION", (0, 0))
+    services = _parse_int_section(lines[start:end], 2)
     
     # Time windows
-    tw_idx = _find_section(lines, "TIME_WINDOW_SECTION")
-    time_windows = _parse_id_two_values_section(lines, tw_idx) if tw_idx else {}
+    start, end = sections.get("TIME_WINDOW_SECTION", (0, 0))
+    time_windows = _parse_int_section(lines[start:end], 3)
     
     # Build instance
-    all_ids = sorted(set(coords.keys()) | set(demands.keys()) | set(time_windows.keys()))
-    n = len(all_ids)
+    all_ids = np.unique(np.concatenate((coord_ids, demands[:, 0], time_windows[:, 0])))
+    n = all_ids.size
     
     if n == 0:
         raise RuntimeError(f"No customer data found in {path.name}")
     
-    depot_id = 1 if 1 in all_ids else all_ids[0]
-    id_to_idx = {node_id: i for i, node_id in enumerate(all_ids)}
-    depot = id_to_idx[depot_id]
+    depot = int(np.searchsorted(all_ids, 1)) if 1 in all_ids else 0
+    
+    # ORTEC ids are usually 1..n, which allows direct offset indexing
+    contiguous = int(all_ids[-1] - all_ids[0]) + 1 == n
     
-    xs = [coords.get(nid, (0.0, 0.0))[0] for nid in all_ids]
-    ys = [coords.get(nid, (0.0, 0.0))[1] for nid in all_ids]
-    demand = [demands.get(nid, 0) for nid in all_ids]
-    service_time = [services.get(nid, 0) for nid in all_ids]
-    ready_time = [time_windows.get(nid, (0, 99999))[0] for nid in all_ids]
-    due_time = [time_windows.get(nid, (0, 99999))[1] for nid in all_ids]
+    xs = _scatter_by_id(all_ids, contiguous, coord_ids, coord_arr[:, 1], 0.0, np.float64)
+    ys = _scatter_by_id(all_ids, contiguous, coord_ids, coord_arr[:, 2], 0.0, np.float64)
+    demand = _scatter_by_id(all_ids, contiguous, demands[:, 0], demands[:, 1], 0, np.int32)
+    service_time = _scatter_by_id(all_ids, contiguous, services[:, 0], services[:, 1], 0, np.int32)
+    ready_time = _scatter_by_id(all_ids, contiguous, time_windows[:, 0], time_windows[:, 1], 0, np.int32)
+    due_time = _scatter_by_id(all_ids, contiguous, time_windows[:, 0], time_windows[:, 2], 99999, np.int32)
     
     # Build or compute travel time matrix
-    if travel_time and len(travel_time) == n:
+    if travel_time is not None and len(travel_time) == n:
         pass  # Use provided matrix
     else:
-        travel_time = [[0] * n for _ in range(n)]
-        for i in range(n):
-            for j in range(n):
-                if i != j:
-                    travel_time[i][j] = _euclid_rounded(xs[i], ys[i], xs[j], ys[j])
+        travel_time = _euclid_rounded_matrix(xs, ys)
     
     return VRPTWInstance(
         n_vehicles=n_vehicles,
         capacity=capacity,
         depot=depot,
-        travel_time=travel_time,
+        travel_time=np.ascontiguousarray(travel_time, dtype=np.int32),
         demand=demand,
         ready_time=ready_time,
         due_time=due_time,
         service_time=service_time,
     )
+
+
+def load_ortec_vrptw_cached(path: Path) -> VRPTWInstance:
+    """
+    Load ORTEC VRPTW instance, reusing a pickle cache next to the file.
+    
+    The cache (same name, ``.pkl`` suffix) is only trusted when it is at
+    least as new as the instance file; otherwise the instance is parsed
+    again and the cache rewritten.
+    
+    Args:
+        path: Path to instance file
+        
+    Returns:
+        VRPTWInstance object
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Instance not found: {path}")
+
+    cache_path = path.with_suffix(".pkl")
+    if cache_path.exists() and cache_path.stat().st_mtime >= path.stat().st_mtime:
+        try:
+            with cache_path.open("rb") as fh:
+                version, inst = pickle.load(fh)
+            if version == _CACHE_VERSION and isinstance(inst, VRPTWInstance):
+                return inst
+        except Exception:
+            pass  # Corrupt or incompatible cache, rebuild below
+
+    inst = load_ortec_vrptw(path)
+
+    # Write to a temp file first so concurrent runs never see a partial cache
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp_path.open("wb") as fh:
+            pickle.dump((_CACHE_VERSION, inst), fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+    return inst
@@ -2,15 +2,32 @@
 """
 Local search improvement for VRPTW solutions.
 """
-from typing import Tuple
+from typing import List, Optional
+import random
 import time
 
-from instance import VRPTWInstance
+import numpy as np
+
+from instance import SearchInstance
 from solution import Solution, Route
-from regret_constructor import is_time_feasible_route, route_load
+from regret_constructor import (
+    insertion_delta,
+    is_time_feasible_insertion,
+    is_time_feasible_join,
+    is_time_feasible_splice,
+    prefix_loads,
+    route_schedule,
+)
+
+# Size of the granular neighborhood: moves are only tried next to the
+# GRANULAR_NEIGHBORS nearest customers of the customer being moved
+GRANULAR_NEIGHBORS = 40
 
+# Segment lengths moved by Or-opt (single customers are covered by relocate)
+OR_OPT_LENGTHS = (2, 3)
 
-def route_cost(inst: VRPTWInstance, route: Route) -> int:
+
+def route_cost(inst: SearchInstance, route: Route) -> int:
     """Calculate travel cost for a route."""
     d = inst.depot
     c = inst.travel_time
@@ -23,125 +40,418 @@ def route_cost(inst: VRPTWInstance, route: Route) -> int:
     return cost
 
 
-def solution_cost(inst: VRPTWInstance, sol: Solution) -> int:
+def solution_cost(inst: SearchInstance, sol: Solution) -> int:
     """Calculate total solution cost."""
     return sum(route_cost(inst, r) for r in sol.routes)
 
 
-def _feasible_route(inst: VRPTWInstance, route: Route) -> bool:
-    """Check if route is feasible (capacity + time windows)."""
-    if route_load(inst, route) > inst.capacity:
-        return False
-    return is_time_feasible_route(inst, route)
+def nearest_neighbors(inst: SearchInstance, k: int = GRANULAR_NEIGHBORS) -> List[List[int]]:
+    """
+    Nearest customers of every node by travel time.
 
+    Args:
+        inst: VRPTW instance
+        k: Number of neighbors per node
 
-def _try_relocate(inst: VRPTWInstance, sol: Solution) -> Tuple[bool, int]:
-    """Try relocating customers between routes (best-improving)."""
-    base = solution_cost(inst, sol)
-    best_sol = None
-    best = base
+    Returns:
+        List indexed by node; entry v lists the k customers closest to v
+        (excluding v and the depot), nearest first
+    """
+    tt = inst.source.travel_time.astype(np.int64)
+    n = len(tt)
+    k = max(0, min(k, n - 2))
+    tt[np.arange(n), np.arange(n)] = np.iinfo(np.int64).max
+    tt[:, inst.depot] = np.iinfo(np.int64).max
+    return np.argsort(tt, axis=1, kind="stable")[:, :k].tolist()
+
+
+def _refresh_routes(inst: SearchInstance, sol: Solution, r_idxs, prefixes, schedules):
+    """
+    Update the per-route caches after a move changed the routes in r_idxs.
 
-    for ra_idx, ra in enumerate(sol.routes):
-        for i, cust in enumerate(ra):
-            ra2 = ra[:i] + ra[i+1:]
-            if ra2 and not _feasible_route(inst, ra2):
+    The move itself (a Solution.apply_* method) already updated the node
+    index; emptied routes are dropped here.
+    """
+    # Highest index first so dropping a route never shifts one still to refresh
+    for r_idx in sorted(set(r_idxs), reverse=True):
+        route = sol.routes[r_idx]
+        if not route:
+            del sol.routes[r_idx], sol.route_loads[r_idx]
+            del prefixes[r_idx], schedules[r_idx]
+            sol.reindex_routes(r_idx)
+            continue
+        prefixes[r_idx] = prefix_loads(inst, route)
+        sol.route_loads[r_idx] = prefixes[r_idx][-1]
+        schedules[r_idx] = route_schedule(inst, route)
+
+
+def _try_relocate(
+    inst: SearchInstance,
+    sol: Solution,
+    cust: int,
+    neighbors: List[int],
+    prefixes,
+    schedules,
+) -> Optional[List[int]]:
+    """
+    Relocate cust next to the first neighbor in another route where that lowers cost.
+
+    Returns:
+        Nodes whose arcs changed if a move was applied, None otherwise
+    """
+    c = inst.travel_time
+    d = inst.depot
+    routes = sol.routes
+    route_of = sol.route_of
+    pos_in_route = sol.pos_in_route
+    ra_idx = route_of[cust]
+    i = pos_in_route[cust]
+    ra = routes[ra_idx]
+    prev = ra[i - 1] if i > 0 else d
+    succ = ra[i + 1] if i < len(ra) - 1 else d
+    remove_delta = c[prev][succ] - c[prev][cust] - c[cust][succ]
+    room = inst.capacity - inst.demand[cust]
+    route_loads = sol.route_loads
+    ea, la = schedules[ra_idx]
+    removal_ok = None
+
+    for v in neighbors:
+        rb_idx = route_of[v]
+        if rb_idx < 0 or rb_idx == ra_idx or route_loads[rb_idx] > room:
+            continue
+        rb = routes[rb_idx]
+        pos_v = pos_in_route[v]
+        # Insert directly before or directly after v
+        for pos in (pos_v, pos_v + 1):
+            if remove_delta + insertion_delta(c, d, rb, pos, cust) >= 0:
                 continue
 
-            for rb_idx, rb in enumerate(sol.routes):
-                if rb_idx == ra_idx:
-                    continue
-                for pos in range(len(rb) + 1):
-                    rb2 = rb[:pos] + [cust] + rb[pos:]
-                    if not _feasible_route(inst, rb2):
-                        continue
+            if removal_ok is None:
+                removal_ok = is_time_feasible_splice(inst, ra, ea, la, i, i + 1, ())
+            if not removal_ok:
+                return None
+            eb, lb = schedules[rb_idx]
+            if not is_time_feasible_insertion(inst, rb, pos, cust, eb, lb):
+                continue
+
+            p = rb[pos - 1] if pos > 0 else d
+            s = rb[pos] if pos < len(rb) else d
+            sol.apply_relocate(cust, rb_idx, pos)
+            _refresh_routes(inst, sol, (ra_idx, rb_idx), prefixes, schedules)
+            return [cust, prev, succ, p, s]
+
+    return None
+
+
+def _try_swap(
+    inst: SearchInstance,
+    sol: Solution,
+    a: int,
+    neighbors: List[int],
+    prefixes,
+    schedules,
+) -> Optional[List[int]]:
+    """
+    Swap a with the first neighbor in another route where that lowers cost.
+
+    Returns:
+        Nodes whose arcs changed if a move was applied, None otherwise
+    """
+    c = inst.travel_time
+    d = inst.depot
+    demand = inst.demand
+    capacity = inst.capacity
+    routes = sol.routes
+    route_of = sol.route_of
+    pos_in_route = sol.pos_in_route
+    ra_idx = route_of[a]
+    i = pos_in_route[a]
+    ra = routes[ra_idx]
+    pa = ra[i - 1] if i > 0 else d
+    sa = ra[i + 1] if i < len(ra) - 1 else d
+    out_a = c[pa][a] + c[a][sa]
+    ea, la = schedules[ra_idx]
+    route_loads = sol.route_loads
+    # ra can take b if demand[b] <= room_a
+    room_a = capacity - route_loads[ra_idx] + demand[a]
+
+    for b in neighbors:
+        rb_idx = route_of[b]
+        if rb_idx < 0 or rb_idx == ra_idx:
+            continue
+        # Capacity first: two cached loads, cheaper than the arc delta
+        demand_b = demand[b]
+        if demand_b > room_a or route_loads[rb_idx] - demand_b + demand[a] > capacity:
+            continue
+        rb = routes[rb_idx]
+        j = pos_in_route[b]
+        pb = rb[j - 1] if j > 0 else d
+        sb = rb[j + 1] if j < len(rb) - 1 else d
+        delta_a = c[pa][b] + c[b][sa] - out_a
+        delta_b = c[pb][a] + c[a][sb] - c[pb][b] - c[b][sb]
+        if delta_a + delta_b >= 0:
+            continue
+
+        eb, lb = schedules[rb_idx]
+        if not is_time_feasible_splice(inst, rb, eb, lb, j, j + 1, (a,)):
+            continue
+        if not is_time_feasible_splice(inst, ra, ea, la, i, i + 1, (b,)):
+            continue
 
-                    cand = sol.copy()
-                    cand.routes[ra_idx] = ra2
-                    cand.routes[rb_idx] = rb2
-                    cand.routes = [r for r in cand.routes if len(r) > 0]
+        sol.apply_swap(a, b)
+        _refresh_routes(inst, sol, (ra_idx, rb_idx), prefixes, schedules)
+        return [a, b, pa, sa, pb, sb]
 
-                    val = solution_cost(inst, cand)
-                    if val < best:
-                        best = val
-                        best_sol = cand
+    return None
 
-    if best_sol is None:
-        return False, 0
 
-    sol.routes = best_sol.routes
-    return True, best - base
+def _try_or_opt(
+    inst: SearchInstance,
+    sol: Solution,
+    u: int,
+    neighbors: List[int],
+    prefixes,
+    schedules,
+) -> Optional[List[int]]:
+    """
+    Move a segment of 2-3 consecutive customers next to a neighbor of u.
 
+    Segments starting at u are tried directly after a neighbor, segments
+    ending at u directly before one, within the same route or another.
 
-def _try_swap(inst: VRPTWInstance, sol: Solution) -> Tuple[bool, int]:
-    """Try swapping customers between routes."""
-    base = solution_cost(inst, sol)
-    best_sol = None
-    best = base
+    Returns:
+        Nodes whose arcs changed if a move was applied, None otherwise
+    """
+    c = inst.travel_time
+    d = inst.depot
+    capacity = inst.capacity
+    routes = sol.routes
+    route_of = sol.route_of
+    pos_in_route = sol.pos_in_route
+    route_loads = sol.route_loads
+    ra_idx = route_of[u]
+    ra = routes[ra_idx]
+    n_a = len(ra)
+    pos_u = pos_in_route[u]
+    qa = prefixes[ra_idx]
+    ea, la = schedules[ra_idx]
 
-    for ra_idx in range(len(sol.routes)):
-        ra = sol.routes[ra_idx]
-        for rb_idx in range(ra_idx + 1, len(sol.routes)):
-            rb = sol.routes[rb_idx]
+    for seg_len in OR_OPT_LENGTHS:
+        for i, after in ((pos_u, True), (pos_u - seg_len + 1, False)):
+            k = i + seg_len
+            if i < 0 or k > n_a:
+                continue
+            first = ra[i]
+            last = ra[k - 1]
+            p0 = ra[i - 1] if i > 0 else d
+            n0 = ra[k] if k < n_a else d
+            remove_delta = c[p0][n0] - c[p0][first] - c[last][n0]
+            seg_load = qa[k] - qa[i]
+            removal_ok = None
 
-            for i, a in enumerate(ra):
-                for j, b in enumerate(rb):
-                    ra2 = ra[:]
-                    rb2 = rb[:]
-                    ra2[i] = b
-                    rb2[j] = a
+            for v in neighbors:
+                rb_idx = route_of[v]
+                if rb_idx < 0:
+                    continue
+                pos_v = pos_in_route[v]
+                pos = pos_v + 1 if after else pos_v
+                same_route = rb_idx == ra_idx
+                if same_route and i <= pos <= k:
+                    continue
+                if not same_route and route_loads[rb_idx] + seg_load > capacity:
+                    continue
+                rb = routes[rb_idx]
+                p = rb[pos - 1] if pos > 0 else d
+                s = rb[pos] if pos < len(rb) else d
+                if remove_delta + c[p][first] + c[last][s] - c[p][s] >= 0:
+                    continue
 
-                    if not _feasible_route(inst, ra2):
+                seg = ra[i:k]
+                if same_route:
+                    # Rewrite the stretch between the old and new segment positions
+                    if pos < i:
+                        lo, hi, moved = pos, k, seg + ra[pos:i]
+                    else:
+                        lo, hi, moved = i, pos, ra[k:pos] + seg
+                    if not is_time_feasible_splice(inst, ra, ea, la, lo, hi, moved):
                         continue
-                    if not _feasible_route(inst, rb2):
+                else:
+                    if removal_ok is None:
+                        removal_ok = is_time_feasible_splice(inst, ra, ea, la, i, k, ())
+                    if not removal_ok:
+                        break
+                    eb, lb = schedules[rb_idx]
+                    if not is_time_feasible_splice(inst, rb, eb, lb, pos, pos, seg):
                         continue
 
-                    cand = sol.copy()
-                    cand.routes[ra_idx] = ra2
-                    cand.routes[rb_idx] = rb2
-                    val = solution_cost(inst, cand)
-                    if val < best:
-                        best = val
-                        best_sol = cand
+                sol.apply_or_opt(ra_idx, i, k, rb_idx, pos)
+                _refresh_routes(inst, sol, (ra_idx, rb_idx), prefixes, schedules)
+                return [first, last, p0, n0, p, s]
+
+    return None
+
+
+def _try_2opt_star(
+    inst: SearchInstance,
+    sol: Solution,
+    u: int,
+    neighbors: List[int],
+    prefixes,
+    schedules,
+) -> Optional[List[int]]:
+    """
+    Exchange route tails so that u is followed by one of its neighbors.
+
+    For u in route A and v in route B, A[:i+1] + B[j:] and B[:j] + A[i+1:]
+    replace A and B (i, j the positions of u and v).
+
+    Returns:
+        Nodes whose arcs changed if a move was applied, None otherwise
+    """
+    c = inst.travel_time
+    d = inst.depot
+    capacity = inst.capacity
+    routes = sol.routes
+    route_of = sol.route_of
+    pos_in_route = sol.pos_in_route
+    ra_idx = route_of[u]
+    ra = routes[ra_idx]
+    i = pos_in_route[u]
+    a_next = ra[i + 1] if i < len(ra) - 1 else d
+    c_u = c[u]
+    qa = prefixes[ra_idx]
+    head_a = qa[i + 1]
+    tail_a = qa[-1] - head_a
+    ea, la = schedules[ra_idx]
+
+    for v in neighbors:
+        rb_idx = route_of[v]
+        if rb_idx < 0 or rb_idx == ra_idx:
+            continue
+        j = pos_in_route[v]
+        qb = prefixes[rb_idx]
+        if head_a + qb[-1] - qb[j] > capacity or qb[j] + tail_a > capacity:
+            continue
+        rb = routes[rb_idx]
+        b_prev = rb[j - 1] if j > 0 else d
+        # Arc b_prev -> a_next; both depots means route B ends up empty
+        join_b = c[b_prev][a_next] if b_prev != d or a_next != d else 0
+        delta = c_u[v] + join_b - c_u[a_next] - c[b_prev][v]
+        if delta >= 0:
+            continue
+
+        eb, lb = schedules[rb_idx]
+        if not is_time_feasible_join(inst, ra, ea, i + 1, (), rb, lb, j):
+            continue
+        if not is_time_feasible_join(inst, rb, eb, j, (), ra, la, i + 1):
+            continue
 
-    if best_sol is None:
-        return False, 0
+        sol.apply_2opt_star(u, v)
+        _refresh_routes(inst, sol, (ra_idx, rb_idx), prefixes, schedules)
+        return [u, a_next, b_prev, v]
 
-    sol.routes = best_sol.routes
-    return True, best - base
+    return None
+
+
+# Operators tried for each customer, in random order (RVND)
+OPERATORS = (_try_relocate, _try_swap, _try_or_opt, _try_2opt_star)
+
+
+def _descend(
+    inst: SearchInstance,
+    sol: Solution,
+    neighbors: List[List[int]],
+    rng: random.Random,
+    prefixes,
+    schedules,
+    deadline: float = None,
+) -> bool:
+    """
+    Apply improving moves until every customer's don't-look bit is set.
+
+    Returns:
+        True if the search converged, False if the deadline was reached
+    """
+    dont_look = [False] * inst.n_nodes
+    operators = list(OPERATORS)
+
+    improved = True
+    while improved:
+        improved = False
+        for cust in [v for r in sol.routes for v in r]:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+            if dont_look[cust]:
+                continue
+
+            near = neighbors[cust]
+            rng.shuffle(operators)
+            for operator in operators:
+                touched = operator(inst, sol, cust, near, prefixes, schedules)
+                if touched is not None:
+                    break
+            else:
+                dont_look[cust] = True
+                continue
+
+            for v in touched:
+                dont_look[v] = False
+            improved = True
+
+    return True
 
 
 def local_search(
-    inst: VRPTWInstance,
+    inst: SearchInstance,
     sol: Solution,
     deadline: float = None,
     verbose: bool = False,
+    neighbors: Optional[List[List[int]]] = None,
+    seed: int = 0,
 ) -> Solution:
     """
-    Local search using relocate and swap operators.
+    Local search using relocate, swap, Or-opt and 2-opt* operators.
+
+    Customers are scanned in route order. For each customer the operators
+    are tried in a random order (randomized variable neighborhood descent)
+    and the first improving move involving the customer is applied. Moves
+    are restricted to a neighborhood: a customer is only linked to one of
+    its neighbors. A customer with no improving move gets its don't-look
+    bit set and is skipped until a move changes one of its adjacent arcs;
+    a descent stops once every bit is set.
+
+    Without explicit neighbors, a fast descent over the GRANULAR_NEIGHBORS
+    nearest neighbors runs first. If it converges before the deadline, the
+    search continues from its local optimum with every customer as a
+    neighbor, so a large budget buys the quality of the full neighborhood.
     
     Args:
         inst: VRPTW instance
         sol: Initial solution (modified in-place)
         deadline: Optional time deadline (perf_counter)
         verbose: Print progress
+        neighbors: Neighbor lists, e.g. from nearest_neighbors (granular,
+            then full lists if not given)
+        seed: Seed for the operator order
         
     Returns:
         Improved solution
     """
-    while True:
-        if deadline is not None and time.perf_counter() >= deadline:
+    if neighbors is None:
+        stages = [GRANULAR_NEIGHBORS, inst.n_nodes]
+    else:
+        stages = [neighbors]
+    rng = random.Random(seed)
+    sol.build_index(inst.n_nodes)
+    prefixes = [prefix_loads(inst, r) for r in sol.routes]
+    sol.route_loads = [q[-1] for q in prefixes]
+    schedules = [route_schedule(inst, r) for r in sol.routes]
+
+    for stage in stages:
+        near = nearest_neighbors(inst, stage) if isinstance(stage, int) else stage
+        if not _descend(inst, sol, near, rng, prefixes, schedules, deadline):
             if verbose:
                 print("[INFO] Deadline reached during local search")
             break
 
-        improved, _ = _try_relocate(inst, sol)
-        if improved:
-            continue
-
-        improved, _ = _try_swap(inst, sol)
-        if improved:
-            continue
-
-        break
-
     return sol
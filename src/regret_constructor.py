@@ -2,49 +2,121 @@
 """
 Regret-based construction heuristic for VRPTW.
 """
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+import heapq
 import math
 import time
 
-from instance import VRPTWInstance
+import numpy as np
+
+from instance import SearchInstance, VRPTWInstance
 from solution import Route, Solution
 
 
-def insertion_delta(inst: VRPTWInstance, route: Route, pos: int, customer: int) -> int:
-    """Calculate cost delta of inserting customer at position pos in route."""
-    c = inst.travel_time
-    d = inst.depot
+def insertion_delta(c, d: int, route: Route, pos: int, customer: int) -> int:
+    """
+    Calculate cost delta of inserting customer at position pos in route.
 
-    if len(route) == 0:
-        prev = d
-        succ = d
-    else:
-        prev = d if pos == 0 else route[pos - 1]
-        succ = d if pos == len(route) else route[pos]
+    Takes the travel-time matrix c and depot d rather than the instance so
+    that callers in move loops look them up once, not per candidate.
+    """
+    prev = d if pos == 0 else route[pos - 1]
+    succ = d if pos == len(route) else route[pos]
 
     old_cost = c[prev][succ]
     new_cost = c[prev][customer] + c[customer][succ]
     return new_cost - old_cost
 
 
-def route_load(inst: VRPTWInstance, route: Route) -> int:
-    """Calculate total demand of a route."""
-    return sum(inst.demand[c] for c in route)
-
-
-def is_time_feasible_route(inst: VRPTWInstance, route: Route) -> bool:
-    """Check if route satisfies all time windows."""
+def route_schedule(inst: SearchInstance, route: Route) -> Tuple[List[float], List[float]]:
+    """
+    Earliest and latest service start times for each position of a route.
+
+    earliest[k] is the earliest time service can start at route[k] when
+    leaving the depot at time 0 (inf once a time window is missed).
+    latest[k] is the latest start at route[k] that still lets the rest of
+    the route meet its time windows (-inf if none does). Together they make
+    single-position insertion, removal and replacement checks O(1), see
+    is_time_feasible_splice and is_time_feasible_join.
+    """
     c = inst.travel_time
     ready = inst.ready_time
     due = inst.due_time
     service = inst.service_time
     d = inst.depot
+    n = len(route)
 
+    earliest = [0] * n
     t = 0
     prev = d
+    for k, cust in enumerate(route):
+        t += c[prev][cust]
+        if t < ready[cust]:
+            t = ready[cust]
+        if t > due[cust]:
+            t = math.inf
+        earliest[k] = t
+        t += service[cust]
+        prev = cust
+
+    latest = [0] * n
+    nxt = d
+    limit = due[d]
+    for k in range(n - 1, -1, -1):
+        cust = route[k]
+        t = limit - c[cust][nxt] - service[cust]
+        if due[cust] < t:
+            t = due[cust]
+        if t < ready[cust]:
+            t = -math.inf
+        latest[k] = t
+        nxt = cust
+        limit = t
+
+    return earliest, latest
+
+
+def prefix_loads(inst: SearchInstance, route: Route) -> List[int]:
+    """Cumulative demand: entry k is the load of route[:k] (len(route) + 1 entries)."""
+    demand = inst.demand
+    loads = [0] * (len(route) + 1)
+    q = 0
+    for k, cust in enumerate(route):
+        q += demand[cust]
+        loads[k + 1] = q
+    return loads
+
+
+def is_time_feasible_join(
+    inst: SearchInstance,
+    head: Route,
+    head_earliest: List[float],
+    i: int,
+    seq: Route,
+    tail: Route,
+    tail_latest: List[float],
+    j: int,
+) -> bool:
+    """
+    Check if head[:i] + seq + tail[j:] satisfies all time windows.
+
+    head_earliest and tail_latest come from route_schedule of head and
+    tail, so the cost is O(len(seq)) regardless of the route lengths.
+    """
+    c = inst.travel_time
+    ready = inst.ready_time
+    due = inst.due_time
+    service = inst.service_time
+    d = inst.depot
 
-    for cust in route:
+    if i > 0:
+        prev = head[i - 1]
+        t = head_earliest[i - 1] + service[prev]
+    else:
+        prev = d
+        t = 0
+
+    for cust in seq:
         t += c[prev][cust]
         if t < ready[cust]:
             t = ready[cust]
@@ -53,82 +125,181 @@ def is_time_feasible_route(inst: VRPTWInstance, route: Route) -> bool:
         t += service[cust]
         prev = cust
 
-    t += c[prev][d]
-    if t > due[d]:
-        return False
-    return True
+    if j < len(tail):
+        nxt = tail[j]
+        t += c[prev][nxt]
+        if t < ready[nxt]:
+            t = ready[nxt]
+        return t <= tail_latest[j]
+    return t + c[prev][d] <= due[d]
+
+
+def is_time_feasible_splice(
+    inst: SearchInstance,
+    route: Route,
+    earliest: List[float],
+    latest: List[float],
+    i: int,
+    j: int,
+    seq: Route,
+) -> bool:
+    """
+    Check if route[:i] + seq + route[j:] satisfies all time windows.
+
+    Uses the schedule of route from route_schedule, so the cost is
+    O(len(seq)) regardless of the route length.
+    """
+    return is_time_feasible_join(inst, route, earliest, i, seq, route, latest, j)
+
 
+def is_time_feasible_insertion(
+    inst: SearchInstance,
+    route: Route,
+    pos: int,
+    customer: int,
+    earliest: List[float],
+    latest: List[float],
+) -> bool:
+    """
+    Check if inserting customer at pos maintains time feasibility.
 
-def is_time_feasible_insertion(inst: VRPTWInstance, route: Route, pos: int, customer: int) -> bool:
-    """Check if inserting customer at pos maintains time feasibility."""
-    new_route = route[:pos] + [customer] + route[pos:]
-    return is_time_feasible_route(inst, new_route)
+    Uses the schedule of route from route_schedule, so the check is O(1).
+    """
+    return is_time_feasible_splice(inst, route, earliest, latest, pos, pos, (customer,))
 
 
-@dataclass
-class RegretInfo:
-    customer: int
-    best_cost: int
-    regret: float
+# Per-route insertion summary: (best delta, second-best delta, best position)
+RouteBest = Tuple[float, float, Optional[int]]
 
 
-def best_two_insertions(inst: VRPTWInstance, sol: Solution, customer: int) -> Tuple[Optional[int], Optional[int]]:
+def _route_best_two(
+    np_inst: VRPTWInstance,
+    route: Route,
+    schedule: Tuple[List[float], List[float]],
+    load: int,
+    customers: List[int],
+) -> List[RouteBest]:
     """
-    Find best and second-best insertion costs for a customer.
-    Returns (best_cost, second_best_cost) or (None, None) if infeasible.
+    Best and second-best feasible insertion deltas of each customer into one route.
+
+    All (customer, position) pairs are evaluated at once with NumPy; the
+    time windows are checked in O(1) per pair against the route schedule.
+
+    Args:
+        np_inst: NumPy-backed instance (SearchInstance.source)
+        route: Route to insert into
+        schedule: route_schedule of route
+        load: Total demand of route
+        customers: Customers to evaluate
+
+    Returns:
+        One RouteBest per customer, in order
     """
+    c = np_inst.travel_time
+    ready = np_inst.ready_time
+    due = np_inst.due_time
+    service = np_inst.service_time
+    d = np_inst.depot
+    earliest, latest = schedule
+    custs = np.asarray(customers)
+
+    # Position pos inserts between prev[pos] and succ[pos]
+    nodes = np.array([d] + route + [d])
+    prev = nodes[:-1]
+    succ = nodes[1:]
+    depart = np.zeros(len(prev))
+    depart[1:] = np.asarray(earliest, dtype=np.float64) + service[route]
+    # Latest start at succ, or the depot deadline for the last position
+    limit = np.append(np.asarray(latest, dtype=np.float64), due[d])
+    ready_succ = ready[succ]
+    ready_succ[-1] = 0
+
+    to_cust = c[np.ix_(prev, custs)].T
+    from_cust = c[np.ix_(custs, succ)]
+    deltas = (to_cust + from_cust - c[prev, succ]).astype(np.float64)
+
+    arrive = np.maximum(depart + to_cust, ready[custs][:, None])
+    feasible = arrive <= due[custs][:, None]
+    arrive = np.maximum(arrive + (service[custs][:, None] + from_cust), ready_succ)
+    feasible &= arrive <= limit
+    feasible &= (load + np_inst.demand[custs] <= np_inst.capacity)[:, None]
+    deltas[~feasible] = math.inf
+
+    best_pos = deltas.argmin(axis=1)
+    best = deltas[np.arange(len(custs)), best_pos]
+    if deltas.shape[1] > 1:
+        second = np.partition(deltas, 1, axis=1)[:, 1]
+    else:
+        second = np.full(len(custs), math.inf)
+
+    return [
+        (b1, b2, pos) if b1 < math.inf else (math.inf, math.inf, None)
+        for b1, b2, pos in zip(best.tolist(), second.tolist(), best_pos.tolist())
+    ]
+
+
+def _new_route_costs(np_inst: VRPTWInstance) -> List[float]:
+    """
+    Cost of serving each node alone on a new route, inf where that route is
+    infeasible. Depends only on the instance, so it is computed once.
+    """
+    d = np_inst.depot
+    out = np_inst.c_from_depot
+    back = np_inst.c_to_depot
+    start = np.maximum(out, np_inst.ready_time)
+    feasible = (
+        (start <= np_inst.due_time)
+        & (start + np_inst.service_time + back <= np_inst.due_time[d])
+        & (np_inst.demand <= np_inst.capacity)
+    )
+    return np.where(feasible, out + back, math.inf).tolist()
+
+
+def _best_two(
+    per_route: List[RouteBest],
+    new_cost: float,
+) -> Tuple[Optional[float], Optional[float]]:
+    """Combine per-route summaries and the new-route cost into (best, second)."""
     best = math.inf
     second = math.inf
-
-    # Try inserting into existing routes
-    for route in sol:
-        if route_load(inst, route) + inst.demand[customer] > inst.capacity:
-            continue
-        for pos in range(len(route) + 1):
-            if not is_time_feasible_insertion(inst, route, pos, customer):
-                continue
-            delta = insertion_delta(inst, route, pos, customer)
-            if delta < best:
-                second = best
-                best = delta
-            elif delta < second:
-                second = delta
-
-    # Try opening a new route
-    can_open_new = len(sol.routes) < inst.n_vehicles
-    if can_open_new and inst.demand[customer] <= inst.capacity:
-        new_route = [customer]
-        if is_time_feasible_route(inst, new_route):
-            d = inst.depot
-            c = inst.travel_time
-            new_cost = c[d][customer] + c[customer][d]
-            if new_cost < best:
-                second = best
-                best = new_cost
-            elif new_cost < second:
-                second = new_cost
-
-    if best is math.inf:
+    for b1, b2, _ in per_route:
+        if b1 < best:
+            second = min(best, b2)
+            best = b1
+        elif b1 < second:
+            second = b1
+
+    if new_cost < best:
+        second = best
+        best = new_cost
+    elif new_cost < second:
+        second = new_cost
+
+    if best == math.inf:
         return None, None
-    if second is math.inf:
+    if second == math.inf:
         return best, None
     return best, second
 
 
-def compute_regret_list(inst: VRPTWInstance, sol: Solution, unrouted: List[int]) -> List[RegretInfo]:
-    """Compute regret values for all unrouted customers."""
-    infos: List[RegretInfo] = []
-    for cust in unrouted:
-        c1, c2 = best_two_insertions(inst, sol, cust)
-        if c1 is None:
-            continue
-        regret = 1e9 if c2 is None else (c2 - c1)
-        infos.append(RegretInfo(customer=cust, best_cost=c1, regret=regret))
-    return infos
+def _push_regret(
+    heap: list,
+    version: Dict[int, int],
+    cust: int,
+    per_route: List[RouteBest],
+    new_cost: float,
+) -> None:
+    """Queue cust under its current regret; older heap entries for it become stale."""
+    version[cust] += 1
+    c1, c2 = _best_two(per_route, new_cost)
+    if c1 is None:
+        return
+    regret = 1e9 if c2 is None else (c2 - c1)
+    heapq.heappush(heap, (-regret, c1, cust, version[cust]))
 
 
 def regret_insertion_construct(
-    inst: VRPTWInstance,
+    inst: SearchInstance,
     deadline: Optional[float] = None,
     verbose: bool = False,
 ) -> Solution:
@@ -143,10 +314,22 @@ def regret_insertion_construct(
     Returns:
         Solution (may be partial if deadline reached)
     """
+    np_inst = inst.source
+    demand = inst.demand
+    n_vehicles = inst.n_vehicles
     n_nodes = inst.n_nodes
     customers = [i for i in range(n_nodes) if i != inst.depot]
     unrouted = customers[:]
     sol = Solution()
+    route_best: Dict[int, List[RouteBest]] = {cust: [] for cust in unrouted}
+    new_route_costs = _new_route_costs(np_inst)
+
+    # Lazy-deletion heap ordered by (-regret, best cost, customer); an entry
+    # is stale once its customer's version has moved on
+    heap = []
+    version = dict.fromkeys(unrouted, 0)
+    for cust in unrouted:
+        _push_regret(heap, version, cust, route_best[cust], new_route_costs[cust])
 
     it = 0
     while unrouted:
@@ -157,53 +340,70 @@ def regret_insertion_construct(
                 print(f"[WARN] Deadline reached, {len(unrouted)} customers unrouted")
             break
 
-        infos = compute_regret_list(inst, sol, unrouted)
-        if not infos:
+        while heap and heap[0][3] != version.get(heap[0][2]):
+            heapq.heappop(heap)
+        if not heap:
             if verbose:
                 print(f"[WARN] No feasible insertions, {len(unrouted)} customers unrouted")
             break
 
-        infos.sort(key=lambda x: (-x.regret, x.best_cost))
-        chosen = infos[0].customer
+        chosen = heapq.heappop(heap)[2]
 
         # Find best insertion position
         best_delta = math.inf
         best_r = None
         best_pos = None
 
-        for r_idx, route in enumerate(sol.routes):
-            if route_load(inst, route) + inst.demand[chosen] > inst.capacity:
-                continue
-            for pos in range(len(route) + 1):
-                if not is_time_feasible_insertion(inst, route, pos, chosen):
-                    continue
-                delta = insertion_delta(inst, route, pos, chosen)
-                if delta < best_delta:
-                    best_delta = delta
-                    best_r = r_idx
-                    best_pos = pos
+        for r_idx, (delta, _, pos) in enumerate(route_best[chosen]):
+            if delta < best_delta:
+                best_delta = delta
+                best_r = r_idx
+                best_pos = pos
 
         # Try new route
-        if len(sol.routes) < inst.n_vehicles and inst.demand[chosen] <= inst.capacity:
-            if is_time_feasible_route(inst, [chosen]):
-                d = inst.depot
-                c = inst.travel_time
-                new_cost = c[d][chosen] + c[chosen][d]
-                if new_cost < best_delta:
-                    best_delta = new_cost
-                    best_r = "NEW"
-                    best_pos = 0
+        if len(sol.routes) < n_vehicles and new_route_costs[chosen] < best_delta:
+            best_delta = new_route_costs[chosen]
+            best_r = "NEW"
+            best_pos = 0
 
         if best_r is None:
             if verbose:
                 print(f"[WARN] Could not place customer {chosen}")
             break
 
-        if best_r == "NEW":
+        opened = best_r == "NEW"
+        if opened:
             sol.routes.append([chosen])
+            sol.route_loads.append(demand[chosen])
+            best_r = len(sol.routes) - 1
         else:
             sol.routes[best_r].insert(best_pos, chosen)
+            sol.route_loads[best_r] += demand[chosen]
 
         unrouted.remove(chosen)
+        del route_best[chosen]
+        del version[chosen]
+
+        # Only the route that received chosen needs its insertions re-evaluated
+        route = sol.routes[best_r]
+        schedule = route_schedule(inst, route)
+        load = sol.route_loads[best_r]
+        if not unrouted:
+            break
+        entries = _route_best_two(np_inst, route, schedule, load, unrouted)
+        can_open = len(sol.routes) < n_vehicles
+        for cust, entry in zip(unrouted, entries):
+            per_route = route_best[cust]
+            if opened:
+                # Every customer gains an option, and may lose the new-route one
+                per_route.append(entry)
+            else:
+                old = per_route[best_r]
+                per_route[best_r] = entry
+                # A shifted best position alone leaves the regret unchanged
+                if old[0] == entry[0] and old[1] == entry[1]:
+                    continue
+            new_cost = new_route_costs[cust] if can_open else math.inf
+            _push_regret(heap, version, cust, per_route, new_cost)
 
     return sol
@@ -15,8 +15,20 @@ class Solution:
     
     Attributes:
         routes: List of routes, where each route is a list of customer indices
+        route_loads: Total demand of each route, parallel to routes. Kept in
+            sync by construction and local search.
+        route_of: Route index of each node (-1 if unrouted), see build_index
+        pos_in_route: Position of each node within its route
+
+    The apply_* methods perform a move on routes and keep route_of and
+    pos_in_route in sync. Loads depend on the instance and are left to
+    the caller; a route emptied by a move stays in place (empty)
+    until the caller removes it.
     """
     routes: List[Route] = field(default_factory=list)
+    route_loads: List[int] = field(default_factory=list)
+    route_of: List[int] = field(default_factory=list)
+    pos_in_route: List[int] = field(default_factory=list)
 
     def __iter__(self) -> Iterator[Route]:
         """Iterate over routes."""
@@ -24,8 +36,92 @@ class Solution:
 
     def copy(self) -> "Solution":
         """Create deep copy of solution."""
-        return Solution(routes=[r[:] for r in self.routes])
-    
+        return Solution(
+            routes=[r[:] for r in self.routes],
+            route_loads=self.route_loads[:],
+            route_of=self.route_of[:],
+            pos_in_route=self.pos_in_route[:],
+        )
+
+    def build_index(self, n_nodes: int) -> None:
+        """Build route_of and pos_in_route for all routes."""
+        self.route_of = [-1] * n_nodes
+        self.pos_in_route = [-1] * n_nodes
+        self.reindex_routes(0)
+
+    def reindex_route(self, r_idx: int, start: int = 0, stop: int = None) -> None:
+        """Refresh route_of and pos_in_route for routes[r_idx][start:stop]."""
+        route_of = self.route_of
+        pos_in_route = self.pos_in_route
+        route = self.routes[r_idx]
+        if stop is None:
+            stop = len(route)
+        for pos in range(start, stop):
+            cust = route[pos]
+            route_of[cust] = r_idx
+            pos_in_route[cust] = pos
+
+    def reindex_routes(self, start: int) -> None:
+        """Refresh the index for routes[start:], e.g. after a route is removed."""
+        for r_idx in range(start, len(self.routes)):
+            self.reindex_route(r_idx)
+
+    def apply_relocate(self, cust: int, dest_route: int, dest_pos: int) -> None:
+        """Move cust to position dest_pos of another route."""
+        r_idx = self.route_of[cust]
+        i = self.pos_in_route[cust]
+        del self.routes[r_idx][i]
+        self.routes[dest_route].insert(dest_pos, cust)
+        self.reindex_route(r_idx, i)
+        self.reindex_route(dest_route, dest_pos)
+
+    def apply_swap(self, a: int, b: int) -> None:
+        """Exchange the positions of a and b (in different routes)."""
+        route_of = self.route_of
+        pos_in_route = self.pos_in_route
+        ra_idx, rb_idx = route_of[a], route_of[b]
+        i, j = pos_in_route[a], pos_in_route[b]
+        self.routes[ra_idx][i] = b
+        self.routes[rb_idx][j] = a
+        route_of[a], route_of[b] = rb_idx, ra_idx
+        pos_in_route[a], pos_in_route[b] = j, i
+
+    def apply_or_opt(self, r_idx: int, i: int, k: int, dest_route: int, dest_pos: int) -> None:
+        """
+        Move the segment routes[r_idx][i:k] to position dest_pos of dest_route.
+
+        dest_pos indexes the destination route before the segment is removed;
+        within the same route it must lie outside [i, k].
+        """
+        route = self.routes[r_idx]
+        seg = route[i:k]
+        if dest_route == r_idx:
+            if dest_pos < i:
+                route[dest_pos:k] = seg + route[dest_pos:i]
+                self.reindex_route(r_idx, dest_pos, k)
+            else:
+                route[i:dest_pos] = route[k:dest_pos] + seg
+                self.reindex_route(r_idx, i, dest_pos)
+            return
+        self.routes[dest_route][dest_pos:dest_pos] = seg
+        del route[i:k]
+        self.reindex_route(r_idx, i)
+        self.reindex_route(dest_route, dest_pos)
+
+    def apply_2opt_star(self, u: int, v: int) -> None:
+        """
+        Exchange route tails so that u is directly followed by v.
+
+        With u at position i of route A and v at position j of route B,
+        A becomes A[:i+1] + B[j:] and B becomes B[:j] + A[i+1:].
+        """
+        ra_idx, rb_idx = self.route_of[u], self.route_of[v]
+        i, j = self.pos_in_route[u] + 1, self.pos_in_route[v]
+        ra, rb = self.routes[ra_idx], self.routes[rb_idx]
+        self.routes[ra_idx], self.routes[rb_idx] = ra[:i] + rb[j:], rb[:j] + ra[i:]
+        self.reindex_route(ra_idx, i)
+        self.reindex_route(rb_idx, j)
+
     def num_routes(self) -> int:
         """Number of routes in solution."""
         return len(self.routes)
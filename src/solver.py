@@ -5,7 +5,7 @@ Main VRPTW solver combining regret construction + local search + validation.
 from typing import Tuple
 import time
 
-from instance import VRPTWInstance
+from instance import VRPTWInstance, to_search_instance
 from solution import Solution
 from regret_constructor import regret_insertion_construct
 from local_search import local_search, solution_cost
@@ -32,18 +32,19 @@ def solve_instance(
     """
     t0 = time.perf_counter()
     deadline = t0 + float(budget_s)
+    search_inst = to_search_instance(inst)
 
     # Construction
     if verbose:
         print("[PHASE] Regret construction...")
-    sol = regret_insertion_construct(inst, deadline=deadline, verbose=verbose)
-    init_cost = solution_cost(inst, sol)
+    sol = regret_insertion_construct(search_inst, deadline=deadline, verbose=verbose)
+    init_cost = solution_cost(search_inst, sol)
 
     # Local search
     if verbose:
         print("[PHASE] Local search...")
-    sol = local_search(inst, sol, deadline=deadline, verbose=verbose)
-    final_cost = solution_cost(inst, sol)
+    sol = local_search(search_inst, sol, deadline=deadline, verbose=verbose)
+    final_cost = solution_cost(search_inst, sol)
 
     # Validation
     is_valid = True
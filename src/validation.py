@@ -5,6 +5,8 @@ Solution validation module to verify VRPTW constraints.
 from typing import List, Tuple, Optional
 from dataclasses import dataclass
 
+import numpy as np
+
 from instance import VRPTWInstance
 from solution import Solution, Route
 
@@ -32,7 +34,7 @@ class SolutionValidation:
 
 def validate_route_capacity(inst: VRPTWInstance, route: Route) -> Tuple[bool, int, str]:
     """Validate that route respects vehicle capacity."""
-    total_demand = sum(inst.demand[c] for c in route)
+    total_demand = int(np.asarray(inst.demand)[route].sum())
     is_valid = total_demand <= inst.capacity
     
     if is_valid:
@@ -43,45 +45,59 @@ def validate_route_capacity(inst: VRPTWInstance, route: Route) -> Tuple[bool, in
     return is_valid, total_demand, msg
 
 
+def route_arrival_times(inst: VRPTWInstance, route: Route) -> np.ndarray:
+    """
+    Arrival time at each customer of route and, last, back at the depot.
+
+    Arrivals are before waiting for the ready time. The schedule
+    start_k = max(ready_k, start_{k-1} + service + travel) is evaluated as
+    a running maximum over cumulative travel and service times, so the
+    whole route is a handful of NumPy operations.
+    """
+    c = np.asarray(inst.travel_time)
+    ready = np.asarray(inst.ready_time)
+    service = np.asarray(inst.service_time)
+    depot = inst.depot
+    
+    custs = np.asarray(route, dtype=np.intp)
+    nodes = np.concatenate(([depot], custs, [depot]))
+    # Leg k ends at nodes[k + 1]; it starts after serving the previous customer
+    steps = c[nodes[:-1], nodes[1:]].astype(np.int64)
+    steps[1:] += service[custs]
+    no_wait = np.cumsum(steps)
+    # Total waiting accumulated up to and including customer k
+    waited = np.maximum.accumulate(np.maximum(ready[custs] - no_wait[:-1], 0))
+    arrivals = no_wait.copy()
+    arrivals[1:] += waited
+    return arrivals
+
+
 def validate_route_time_windows(inst: VRPTWInstance, route: Route) -> Tuple[bool, List[Tuple[int, int]], List[str]]:
     """Validate that route respects all time windows."""
-    c = inst.travel_time
-    ready = inst.ready_time
-    due = inst.due_time
-    service = inst.service_time
+    due = np.asarray(inst.due_time)
     depot = inst.depot
     
-    violations = []
-    arrival_times = []
-    
-    current_time = 0
-    prev_node = depot
+    arrivals = route_arrival_times(inst, route)
+    customer_arrivals = arrivals[:-1]
+    depot_arrival = int(arrivals[-1])
     
-    for idx, customer in enumerate(route):
-        current_time += c[prev_node][customer]
-        arrival_time = current_time
-        
-        if current_time > due[customer]:
-            violations.append(
-                f"Customer {customer} (pos {idx}): Arrived at {current_time}, "
-                f"due time is {due[customer]} (LATE by {current_time - due[customer]})"
-            )
-        
-        if current_time < ready[customer]:
-            current_time = ready[customer]
-        
-        arrival_times.append((customer, arrival_time))
-        current_time += service[customer]
-        prev_node = customer
-    
-    current_time += c[prev_node][depot]
+    violations = []
+    # Messages are only built for the offending stops
+    for idx in np.flatnonzero(customer_arrivals > due[route]).tolist():
+        customer = route[idx]
+        current_time = int(customer_arrivals[idx])
+        violations.append(
+            f"Customer {customer} (pos {idx}): Arrived at {current_time}, "
+            f"due time is {due[customer]} (LATE by {current_time - due[customer]})"
+        )
     
-    if current_time > due[depot]:
+    if depot_arrival > due[depot]:
         violations.append(
-            f"Depot return: Arrived at {current_time}, "
-            f"due time is {due[depot]} (LATE by {current_time - due[depot]})"
+            f"Depot return: Arrived at {depot_arrival}, "
+            f"due time is {due[depot]} (LATE by {depot_arrival - due[depot]})"
         )
     
+    arrival_times = list(zip(route, customer_arrivals.tolist()))
     is_valid = len(violations) == 0
     return is_valid, arrival_times, violations
 